@@ -2,9 +2,18 @@ import streamlit as st
 from google import genai
 import google.genai.errors as genai_errors
 
+from arquivo import archive_artifact, new_run, show_search_panel
+from artefatos import load_artifact, save_artifact, show_history
+from coalescencia import coalesce, show_singleflight_metrics
+
 # App Streamlit integrado para gerar, analisar, revisar roteiros e metadados de vídeos no YouTube
 
 def call_genai(client, model: str, prompt: str) -> str:
+    """Chama o Google GenAI, compartilhando chamadas idênticas já em andamento em outras sessões."""
+    return coalesce(model, prompt, None, lambda: _call_genai_upstream(client, model, prompt))
+
+
+def _call_genai_upstream(client, model: str, prompt: str) -> str:
     """Chama o Google GenAI para gerar conteúdo via modelo especificado."""
     try:
         response = client.models.generate_content(
@@ -70,11 +79,24 @@ def main():
     api_key = st.secrets.get("google_api_key", "")
     client = genai.Client(api_key=api_key)
 
+    show_singleflight_metrics()
+
+    # Busca no arquivo de roteiros já gerados
+    show_search_panel({
+        "roteiro_inicial": "roteiro",
+        "analise": "analysis",
+        "roteiro_revisado": "revised",
+        "metadados": "meta",
+        "gancho": "gancho",
+    }, {"tema": "tema", "num_palavras": "num_palavras"})
+
     # Inputs principais
-    tema = st.text_input("Tema Bíblico Específico:", "")
+    if "num_palavras" not in st.session_state:
+        st.session_state.num_palavras = 1000
+    tema = st.text_input("Tema Bíblico Específico:", key="tema")
     num_palavras = st.number_input(
         "Número aproximado de palavras para o roteiro inicial:",
-        min_value=100, max_value=10000, value=1000, step=50
+        min_value=100, max_value=10000, step=50, key="num_palavras"
     )
 
     # Botão para gerar todo o pipeline
@@ -83,6 +105,7 @@ def main():
             st.error("Por favor, preencha o tema bíblico.")
         else:
             try:
+                new_run()
                 # 1. Gerar roteiro inicial
                 with st.spinner("Gerando roteiro inicial..."):
                     prompt_script = (
@@ -97,67 +120,100 @@ def main():
                         # Truncated: manter conforme roteirotema.py
                     )
                     roteiro_inicial = call_genai(client, model_name, prompt_script)
-                    st.session_state.roteiro = roteiro_inicial
+                    save_artifact("roteiro", roteiro_inicial)
+                    archive_artifact("roteiro_inicial", roteiro_inicial, tema, model_name, num_palavras=num_palavras)
 
                 # 2. Analisar roteiro
                 with st.spinner("Analisando roteiro..."):
                     analysis = analyze_script(client, model_name, roteiro_inicial)
-                    st.session_state.analysis = analysis
+                    save_artifact("analysis", analysis)
+                    archive_artifact("analise", analysis, tema, model_name, num_palavras=num_palavras)
 
                 # 3. Revisar roteiro (gerar novo roteiro)
                 with st.spinner("Revisando e gerando novo roteiro..."):
                     roteiro_final = generate_script(client, model_name, roteiro_inicial, analysis, num_palavras)
-                    st.session_state.revised = roteiro_final
+                    save_artifact("revised", roteiro_final)
+                    archive_artifact("roteiro_revisado", roteiro_final, tema, model_name, num_palavras=num_palavras)
 
                 # 4. Gerar títulos, descrição e prompt de thumb (usando apenas as 2000 primeiras palavras)
                 with st.spinner("Gerando títulos, descrição e prompt de thumbnail..."):
-                    palavras = st.session_state.revised.split()
+                    palavras = roteiro_final.split()
                     roteiro_truncado = " ".join(palavras[:2000])
                     meta = generate_titles_and_description(client, model_name, roteiro_truncado)
-                    st.session_state.meta = meta
+                    save_artifact("meta", meta)
+                    archive_artifact("metadados", meta, tema, model_name, num_palavras=num_palavras)
 
                 # 5. Reescrever gancho inicial
                 with st.spinner("Gerando gancho inicial revisado..."):
-                    palavras_g = st.session_state.revised.split()
+                    palavras_g = roteiro_final.split()
                     trecho_gancho = " ".join(palavras_g[:250])
                     prompt_gancho = (
                         "Você é especialista em criação de gancho inicial para vídeos, que desperta curiosidade e retenção, "
                         "melhore este gancho e introdução inicial que deverá ter apenas 90 palavras.\n\n" + trecho_gancho
                     )
                     gancho_revisado = call_genai(client, model_name, prompt_gancho)
-                    st.session_state.gancho = gancho_revisado
+                    save_artifact("gancho", gancho_revisado)
+                    archive_artifact("gancho", gancho_revisado, tema, model_name, num_palavras=num_palavras)
 
             except RuntimeError as e:
                 st.error(f"Ocorreu um erro durante o pipeline: {e}")
 
-    # Exibir resultado final
-    if st.session_state.get("gancho"):
+    # Exibir resultado final (versões anteriores ficam no histórico comprimido de artefatos)
+    show_history("gancho", "Gancho")
+    gancho = load_artifact("gancho")
+    if gancho:
         st.subheader("Gancho Inicial Revisado")
-        st.text_area("", st.session_state.gancho, height=100)
+        st.text_area("", gancho, height=100)
         st.download_button(
             label="📥 Baixar Gancho Revisado",
-            data=st.session_state.gancho,
+            data=gancho,
             file_name="gancho_revisado.txt",
             mime="text/plain"
         )
-    if st.session_state.get("revised"):
+    show_history("revised", "Roteiro Final")
+    revised = load_artifact("revised")
+    if revised:
         st.subheader("Roteiro Final")
-        st.text_area("", st.session_state.revised, height=300)
+        st.text_area("", revised, height=300)
         st.download_button(
             label="📥 Baixar Roteiro Final",
-            data=st.session_state.revised,
+            data=revised,
             file_name="roteiro_final.txt",
             mime="text/plain"
         )
-    if st.session_state.get("meta"):
+    show_history("meta", "Metadados")
+    meta = load_artifact("meta")
+    if meta:
         st.subheader("Títulos, Descrição e Prompt de Thumbnail")
-        st.text_area("", st.session_state.meta, height=300)
+        st.text_area("", meta, height=300)
         st.download_button(
             label="📥 Baixar Metadados (Título, Descrição e Prompt)",
-            data=st.session_state.meta,
+            data=meta,
             file_name="metadados.txt",
             mime="text/plain"
         )
+    show_history("roteiro", "Roteiro Inicial")
+    roteiro = load_artifact("roteiro")
+    if roteiro:
+        st.subheader("Roteiro Inicial")
+        st.text_area("", roteiro, height=300)
+        st.download_button(
+            label="📥 Baixar Roteiro Inicial",
+            data=roteiro,
+            file_name="roteiro_inicial.txt",
+            mime="text/plain"
+        )
+    show_history("analysis", "Análise")
+    analysis = load_artifact("analysis")
+    if analysis:
+        st.subheader("Análise do Roteiro")
+        st.text_area("", analysis, height=300)
+        st.download_button(
+            label="📥 Baixar Análise",
+            data=analysis,
+            file_name="analise.txt",
+            mime="text/plain"
+        )
 
 
 if __name__ == "__main__":
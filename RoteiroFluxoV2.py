@@ -2,15 +2,56 @@ import streamlit as st
 from google import genai # Usando o import original
 import google.genai.errors as genai_errors # Usando o import original
 
+from arquivo import archive_artifact, new_run, show_search_panel
+from artefatos import clear_artifact, load_artifact, save_artifact, show_history
+from coalescencia import coalesce, show_singleflight_metrics
+from perfil_prompts import join_sections, show_prompt_lab
+
 # App Streamlit integrado para gerar, analisar, revisar roteiros e metadados de vídeos no YouTube
 
-def call_genai(client, model: str, prompt: str) -> str:
-    """Chama o Google GenAI para gerar conteúdo via modelo especificado."""
+
+class GenAIError(RuntimeError):
+    """Erro ao chamar o GenAI, com os diagnósticos (tipo, conteúdo) a exibir em cada sessão que esperava a chamada."""
+
+    def __init__(self, mensagem: str, diagnosticos: list = None):
+        super().__init__(mensagem)
+        self.diagnosticos = diagnosticos or []
+
+
+def call_genai(client, model: str, prompt: str, config=None, compartilhar: bool = True) -> str:
+    """Chama o Google GenAI, compartilhando chamadas idênticas já em andamento em outras sessões.
+
+    Com `compartilhar=False` a chamada vai sempre ao modelo e fica fora das métricas de deduplicação
+    (usado pelo A/B de prompts, que mede a latência real).
+    """
+    try:
+        if not compartilhar:
+            return _call_genai_upstream(client, model, prompt, config)
+        return coalesce(model, prompt, config, lambda: _call_genai_upstream(client, model, prompt, config))
+    except GenAIError as e:
+        # Os diagnósticos são exibidos aqui para que todas as sessões que compartilharam a chamada os vejam
+        for tipo, conteudo in e.diagnosticos:
+            if tipo == "warning":
+                st.warning(conteudo)
+            elif tipo == "json":
+                st.json(conteudo)
+            else:
+                st.error(conteudo)
+        raise
+
+
+def _call_genai_upstream(client, model: str, prompt: str, config=None) -> str:
+    """Chama o Google GenAI para gerar conteúdo via modelo especificado.
+
+    Não usa a UI do Streamlit: roda apenas na sessão líder e os diagnósticos seguem no GenAIError.
+    """
+    diagnosticos = []
     try:
         # Esta é a forma de chamada que estava no seu código original
         response = client.models.generate_content(
             model=model, # Passa o nome do modelo aqui
             contents=prompt,
+            config=config,
         )
         # Verifica se a resposta tem o atributo 'text' antes de acessá-lo
         # Alguns modelos/versões da API podem retornar a resposta em response.candidates[0].content.parts[0].text
@@ -22,43 +63,47 @@ def call_genai(client, model: str, prompt: str) -> str:
             try:
                 return response.candidates[0].content.parts[0].text.strip()
             except (AttributeError, IndexError, TypeError) as e_alt:
-                st.warning(f"Resposta não continha 'text' diretamente, nem a estrutura 'candidates[0].content.parts[0].text'. Erro no fallback: {e_alt}")
-                st.json(response._result) # Mostra a estrutura da resposta para depuração
+                diagnosticos.append(("warning", f"Resposta não continha 'text' diretamente, nem a estrutura 'candidates[0].content.parts[0].text'. Erro no fallback: {e_alt}"))
+                diagnosticos.append(("json", response._result)) # Mostra a estrutura da resposta para depuração
                 raise RuntimeError(f"Formato de resposta inesperado do GenAI. Verifique a estrutura da resposta: {str(response._result)[:500]}")
         else:
-            st.warning("Resposta do GenAI não continha o atributo 'text' nem 'candidates' esperados.")
-            st.json(response._result) # Mostra a estrutura da resposta para depuração
+            diagnosticos.append(("warning", "Resposta do GenAI não continha o atributo 'text' nem 'candidates' esperados."))
+            diagnosticos.append(("json", response._result)) # Mostra a estrutura da resposta para depuração
             raise RuntimeError(f"Formato de resposta inesperado do GenAI. Resposta (início): {str(response._result)[:500]}")
 
     except genai_errors.ServerError as e:
-        st.error(f"Erro de servidor ao chamar GenAI: {e}")
-        raise RuntimeError(f"Erro de servidor ao chamar GenAI: {e}")
+        diagnosticos.append(("error", f"Erro de servidor ao chamar GenAI: {e}"))
+        raise GenAIError(f"Erro de servidor ao chamar GenAI: {e}", diagnosticos)
     except Exception as e:
-        st.error(f"Erro desconhecido ao chamar GenAI: {e}")
-        st.error(f"Prompt enviado: {prompt[:300]}...") # Log do início do prompt para depuração
+        diagnosticos.append(("error", f"Erro desconhecido ao chamar GenAI: {e}"))
+        diagnosticos.append(("error", f"Prompt enviado: {prompt[:300]}...")) # Log do início do prompt para depuração
         # Se a resposta já foi obtida e o erro ocorreu ao processá-la, ela pode não estar disponível aqui.
         # Mas se o erro foi na chamada, a 'response' não existirá.
-        raise RuntimeError(f"Erro desconhecido ao chamar GenAI: {e}")
+        raise GenAIError(f"Erro desconhecido ao chamar GenAI: {e}", diagnosticos)
 
-def generate_initial_script(client, model: str, tema: str, objetivo: str, num_palavras: int) -> str:
-    """Gera o roteiro inicial com base no tema, objetivo e número de palavras."""
-    prompt = f"""
+def initial_script_sections(tema: str, objetivo: str, num_palavras: int) -> list:
+    """Seções (nome, texto) do prompt original do roteiro inicial; concatenadas formam o prompt completo."""
+    return [
+        ("Contexto, público e tom", f"""
 1. Tema Central do Vídeo: {tema}
 2. Objetivo Principal/Mensagem Chave (O "Quê" e o "Porquê"): Qual a ÚNICA coisa mais importante que você quer que o espectador aprenda ou sinta ao final do vídeo? Por que isso é relevante para ele AGORA?: {objetivo}
 3. Público-Alvo (Ideal): Pessoas buscando introdução à fé de forma simples, Cristãos experientes precisando de renovação, geralmente homens e mulheres entre 18 a 75 anos.
 4. Tom/Estilo Desejado: Conversacional e amigável, Dinâmico e direto ao ponto.
-5. Estrutura do Roteiro (com foco em dinamismo e clareza):
+"""),
+        ("Estrutura e gancho inicial", f"""5. Estrutura do Roteiro (com foco em dinamismo e clareza):
 A0: Numero de palavras totais do roteiro: {num_palavras};
 A. Gancho Inicial (Primeiros 5-10 segundos OBRIGATÓRIOS):
 Crie uma pergunta intrigante, uma afirmação surpreendente, uma estatística chocante ou uma mini-história ultra curta (1-2 frases) relacionada ao tema.
 Objetivo: Despertar curiosidade IMEDIATA e fazer o espectador pensar "Preciso saber mais sobre isso".
 Exemplo para Salomão (se fosse começar de novo): "O homem mais sábio do mundo... destruiu a própria vida. Como? E como você pode evitar o mesmo erro?"
 
-B. Introdução Rápida (Até 30-45 segundos no máximo - 65 a 95 palavras):
+"""),
+        ("Introdução", """B. Introdução Rápida (Até 30-45 segundos no máximo - 65 a 95 palavras):
 Apresente o tema de forma concisa, conectando-o ao gancho.
 Promessa de Valor: Diga claramente o que o espectador vai ganhar/aprender/descobrir assistindo ao vídeo. "Neste vídeo, vamos desvendar..." ou "Você vai descobrir 3 passos para...".
 
-C. Desenvolvimento do Conteúdo (Corpo do Vídeo):
+"""),
+        ("Desenvolvimento", """C. Desenvolvimento do Conteúdo (Corpo do Vídeo):
 Divida o tema em 2-4 pontos principais NO MÁXIMO. Menos é mais se os pontos forem bem desenvolvidos.
 Para cada ponto:
 Explicação Clara e Concisa: Use frases predominantemente curtas e diretas. Evite parágrafos muito longos.
@@ -67,11 +112,13 @@ Exemplos, Analogias ou Mini-Histórias: Para cada ponto abstrato, tente trazer u
 Conexão com o Espectador: Use "você", "nós". Faça perguntas retóricas curtas ("Já se sentiu assim?", "Faz sentido?").
 Pausas Naturais (...): Escreva de forma que as pausas para respiração e ênfase (indicadas por ... ou naturalmente pela pontuação como vírgulas e pontos finais) soem orgânicas para narração TTS. Quebre ideias complexas em frases menores.
 
-D. Lições Práticas / Aplicações / "E Daí?" (se aplicável):
+"""),
+        ("Lições práticas", """D. Lições Práticas / Aplicações / "E Daí?" (se aplicável):
 Transforme o conhecimento em ação. O que o espectador pode FAZER com essa informação?
 Apresente de forma clara e acionável. Em vez de longas listas, foque nos 2-3 pontos mais impactantes e práticos.
 
-E. Conclusão e Chamada Para Ação (CTA):
+"""),
+        ("Conclusão e CTA", """E. Conclusão e Chamada Para Ação (CTA):
 Recapitulação Breve: Em 1-2 frases, reforce a mensagem chave do vídeo.
 Chamada Para Ação Clara e Direta:
 Peça o like: "Se este vídeo te ajudou de alguma forma, deixe seu like para eu saber!"
@@ -81,7 +128,8 @@ Sugira compartilhar: "Compartilhe este vídeo com alguém que precisa ouvir essa
 
 Encerramento: Uma frase final curta e positiva/encorajadora.
 
-6. Diretrizes Adicionais para Manter o Ritmo e Evitar a Monotonia:
+"""),
+        ("Diretrizes de ritmo, TTS e formato", f"""6. Diretrizes Adicionais para Manter o Ritmo e Evitar a Monotonia:
 Variedade: Alterne entre explicação, exemplo, pergunta, afirmação.
 Clareza Acima de Tudo: Se uma ideia é complexa, simplifique-a ou divida-a em partes menores. É melhor ser claro do que tentar ser exaustivo e perder o espectador.
 Relevância Constante: Sempre se pergunte: "Por que o meu público se importaria com isso?". Conecte o conteúdo à vida, dores, desejos e desafios do espectador.
@@ -95,17 +143,55 @@ Use linguagem acessível, sem gírias (como "galera"), palavras excessivamente d
 Mantenha o gancho inicial com introdução em, no máximo, 95 palavras. O texto total deverá ter aproximadamente {num_palavras} palavras.
 Evite ser prolixo ou repetitivo. Crie ganchos narrativos sutis entre as partes para manter o interesse.
 O resultado final deve ser apenas o texto do roteiro, pronto para ser narrado.
-"""
+"""),
+    ]
+
+def compact_initial_script_sections(tema: str, objetivo: str, num_palavras: int) -> list:
+    """Versão compacta do prompt do roteiro inicial, com cada regra dita uma única vez."""
+    return [
+        ("Contexto, público e tom", f"""Escreva um roteiro de vídeo para YouTube em português do Brasil.
+Tema: {tema}
+Mensagem principal (o que o espectador deve aprender ou sentir, e por que importa agora): {objetivo}
+Público: homens e mulheres de 18 a 75 anos, de iniciantes na fé a cristãos experientes buscando renovação.
+Tom: conversacional, amigável, dinâmico e direto.
+"""),
+        ("Estrutura e gancho inicial", """Estrutura:
+A. Gancho (5-10 segundos): pergunta intrigante, afirmação surpreendente ou mini-história de 1-2 frases que gere curiosidade imediata.
+"""),
+        ("Introdução", """B. Introdução: conecte ao gancho e diga o que o espectador vai ganhar assistindo. Gancho + introdução: no máximo 95 palavras.
+"""),
+        ("Desenvolvimento", """C. Desenvolvimento: 2 a 4 pontos principais. Para cada um, frases curtas, linguagem simples (explique termos teológicos na hora), um exemplo, analogia ou mini-história, e conversa direta com "você"/"nós" e perguntas retóricas curtas.
+"""),
+        ("Lições práticas", """D. Aplicação: os 2-3 passos práticos mais impactantes.
+"""),
+        ("Conclusão e CTA", """E. Conclusão: recapitule a mensagem em 1-2 frases; peça like, um comentário com pergunta específica (ou frase como "Eu amo Jesus"), inscrição com sininho e compartilhamento; feche com uma frase curta e encorajadora.
+"""),
+        ("Diretrizes de ritmo, TTS e formato", f"""Regras:
+- Aproximadamente {num_palavras} palavras no total.
+- Texto pronto para narração TTS: frases curtas, sem abreviaturas, "..." para pausas maiores e entre as partes.
+- Sem marcações, títulos de seção ou colchetes; o texto flui naturalmente com ganchos sutis entre as partes.
+- Inclua trechos bíblicos relevantes e uns 3 ditados populares brasileiros, de forma natural.
+- Sem gírias (como "galera"), palavras difíceis ou termos em inglês.
+- Alterne explicação, exemplo, pergunta e afirmação; não seja prolixo nem repetitivo.
+- Responda apenas com o texto do roteiro.
+"""),
+    ]
+
+def generate_initial_script(client, model: str, tema: str, objetivo: str, num_palavras: int, variante: str = "original") -> str:
+    """Gera o roteiro inicial com base no tema, objetivo e número de palavras."""
+    prompt = join_sections(PROMPT_VARIANTS["roteiro_inicial"][variante](tema, objetivo, num_palavras))
     return call_genai(client, model, prompt)
 
-def revise_script(client, model: str, original_script: str, num_palavras: int) -> str:
-    """Revisa o roteiro inicial com base em sugestões de melhoria."""
-    prompt = f"""
+def revise_script_sections(original_script: str, num_palavras: int) -> list:
+    """Seções (nome, texto) do prompt original de revisão; concatenadas formam o prompt completo."""
+    return [
+        ("Papel e missão", f"""
 Você é um especialista em criação de conteúdo viral para YouTube, especializado em narrativas bíblicas. Sua missão é pegar o roteiro fornecido e transformá-lo em uma obra-prima de engajamento que domina o algoritmo e maximiza retenção.
 🎯 SUA MISSÃO
 Reescreva completamente o roteiro fornecido aplicando a estrutura de 15 minutos otimizada (exatamente:{num_palavras}), mantendo 100% da fidelidade bíblica mas transformando-o em conteúdo impossível de parar de assistir.
 Atenção: Não use marcações de tempo ou indicações no roteiro revisado. Ele deve estar pronto para leitura.
-📋 ESTRUTURA OBRIGATÓRIA PARA APLICAR
+"""),
+        ("Estrutura em 7 seções com tempos", """📋 ESTRUTURA OBRIGATÓRIA PARA APLICAR
 🔥 SEÇÃO 1: HOOK DEVASTADOR (0-20s)
 O QUE FAZER:
 Crie uma abertura nos primeiros 5 segundos que seja impossível de ignorar
@@ -173,7 +259,8 @@ Pergunta final que force interação nos comentários
 Desafio prático que o espectador pode aplicar hoje
 Gancho para o próximo vídeo que crie expectativa
 
-⚡ GANCHOS DE RETENÇÃO OBRIGATÓRIOS
+"""),
+        ("Ganchos de retenção por minuto", """⚡ GANCHOS DE RETENÇÃO OBRIGATÓRIOS
 Distribua estas frases (ou similares) ao longo do roteiro:
 Minuto 1: "Mas o que você vai descobrir vai chocar você..."
 Minuto 3: "Você não vai acreditar no que aconteceu depois..."
@@ -183,7 +270,8 @@ Minuto 9: "Isso vai mudar completamente sua perspectiva sobre..."
 Minuto 11: "Aqui está o momento que mudou tudo..."
 Minuto 13: "E a lição que vai transformar sua vida é..."
 
-🎭 TÉCNICAS OBRIGATÓRIAS PARA APLICAR
+"""),
+        ("Técnicas obrigatórias", """🎭 TÉCNICAS OBRIGATÓRIAS PARA APLICAR
 CURIOSITY GAPS (Lacunas de Curiosidade)
 Crie pelo menos 5 momentos onde você:
 Menciona algo intrigante
@@ -203,7 +291,8 @@ A cada 2-3 minutos, conecte com a vida real:
 "Quantas vezes você se sentiu assim..."
 "Essa situação te lembra alguma coisa?"
 
-📊 ELEMENTOS DE ENGAJAMENTO OBRIGATÓRIOS
+"""),
+        ("Elementos de engajamento", """📊 ELEMENTOS DE ENGAJAMENTO OBRIGATÓRIOS
 PERGUNTAS ESTRATÉGICAS (Mínimo 8)
 Distribua perguntas que:
 Façam as pessoas pausarem para pensar
@@ -220,7 +309,8 @@ Para refletir sobre uma revelação
 Para processar uma emoção intensa
 Para comentar uma aplicação pessoal
 
-✅ CHECKLIST FINAL PARA VALIDAÇÃO
+"""),
+        ("Checklist final", """✅ CHECKLIST FINAL PARA VALIDAÇÃO
 Antes de entregar, verifique se o roteiro tem:
 ESTRUTURA:
 [ ] Hook devastador nos primeiros 10 segundos
@@ -242,36 +332,96 @@ TÉCNICO:
 [ ] Transições suaves
 [ ] Fidelidade bíblica 100% mantida
 
-🎯 PROMPT DE EXECUÇÃO
+"""),
+        ("Prompt de execução", """🎯 PROMPT DE EXECUÇÃO
 "Agora pegue o roteiro fornecido e reescreva-o completamente seguindo esta estrutura. O texto deve estar pronto para a narração, sem marcações ou indicações que não serão narrados. Mantenha a essência e verdade bíblica, mas transforme-o em um vídeo viral que domina o algoritmo do YouTube. Inclua todos os ganchos de retenção e técnicas de engajamento. Faça cada minuto valer a permanência do espectador."
-"Roteiro original a ser analisado e reescrito:\n"
+"""),
+        ("Roteiro original", f""""Roteiro original a ser analisado e reescrito:\n"
 + {original_script}
-"""
+"""),
+    ]
+
+def compact_revise_script_sections(original_script: str, num_palavras: int) -> list:
+    """Versão compacta do prompt de revisão, sem tabelas de tempo nem frases modelo repetidas."""
+    return [
+        ("Papel e missão", f"""Você é especialista em conteúdo viral para YouTube sobre narrativas bíblicas.
+Reescreva completamente o roteiro abaixo para um vídeo de cerca de 15 minutos, com exatamente {num_palavras} palavras, mantendo 100% de fidelidade bíblica e maximizando a retenção.
+"""),
+        ("Estrutura em 7 seções com tempos", """Estrutura, em ordem:
+1. Gancho forte com o momento mais dramático, contexto rápido e uma promessa irresistível.
+2. Contexto bíblico essencial e uma primeira revelação pouco conhecida.
+3. Drama humano, primeira aplicação pessoal e tensão crescente.
+4. Primeiro clímax emocional, lições e novo gancho.
+5. Segundo arco: nova perspectiva ou personagem que recontextualiza a história.
+6. Clímax principal, resolvendo todas as curiosidades abertas.
+7. Aplicação prática atual, chamada para ação e gancho para o próximo vídeo.
+"""),
+        ("Ganchos de retenção por minuto", """Distribua cerca de 7 ganchos de retenção ao longo do texto (ex.: "Mas espere, porque tem muito mais...").
+"""),
+        ("Técnicas obrigatórias", """Use pelo menos 5 lacunas de curiosidade resolvidas mais tarde, 3-4 quebras de padrão, prova social e conexões com a vida do espectador a cada 2-3 minutos.
+"""),
+        ("Elementos de engajamento", """Inclua pelo menos 8 perguntas ao público, 4 chamadas para ação integradas (comentar, curtir, compartilhar, inscrever-se) e 3 momentos naturais de pausa para reflexão.
+"""),
+        ("Prompt de execução", """O texto deve estar pronto para narração: sem marcações de tempo, títulos, seções ou indicações que não serão narradas. Responda apenas com o roteiro revisado.
+"""),
+        ("Roteiro original", f"""Roteiro original:
+{original_script}
+"""),
+    ]
+
+def revise_script(client, model: str, original_script: str, num_palavras: int, variante: str = "original") -> str:
+    """Revisa o roteiro inicial com base em sugestões de melhoria."""
+    prompt = join_sections(PROMPT_VARIANTS["revisao"][variante](original_script, num_palavras))
     return call_genai(client, model, prompt)
 
-def generate_titles_and_description(client, model: str, script: str) -> str:
+def titles_and_description_sections(script: str) -> list:
+    """Seções (nome, texto) do prompt de títulos, descrição, tags e thumbnail."""
+    return [
+        ("Títulos", (
+            "Com base no roteiro de vídeo fornecido:\n\n"
+            "1.  **Títulos (Ranking):** Crie 5 sugestões de título para vídeo de YouTube, cada um com no máximo 60 caracteres. Os títulos devem despertar curiosidade, prometer um benefício claro e/ou criar um senso de urgência. Eles devem seguir as melhores práticas para títulos chamativos e bem-sucedidos no YouTube, visando aumentar os cliques sem se afastar do conteúdo do vídeo. Apresente os títulos em um ranking, do melhor para o menos preferido, com uma breve justificativa para o título principal.\n\n"
+        )),
+        ("Descrição", (
+            "2.  **Descrição do Vídeo:** Elabore uma descrição otimizada para SEO com aproximadamente 1800 caracteres. A descrição deve:\n"
+            "    *   Começar com 1-2 frases que expandam o título e o gancho do vídeo, incluindo palavras-chave principais.\n"
+            "    *   Resumir os pontos chave e benefícios do vídeo.\n"
+            "    *   Incluir chamadas para ação (inscrever-se, assistir outros vídeos, links relevantes se houver).\n"
+            "    *   Conter um bloco de hashtags relevantes (ex: #fé #bíblia #mensagemdodia).\n\n"
+        )),
+        ("Tags", "3.  **Tags:** Liste de 10 a 15 tags relevantes para o vídeo, separadas por vírgulas.\n\n"),
+        ("Prompt de thumbnail", (
+            "4.  **Prompt para Thumbnail (Português e Inglês):** Sugira um prompt detalhado para a criação da imagem da thumbnail usando IA (ex: Midjourney, DALL-E). O prompt deve considerar:\n"
+            "    *   **3 Elementos Visuais Principais:** Um rosto humano com expressão forte e visível (localizado preferencialmente à direita da imagem), uma cena de fundo ou elemento que remeta ao tema do vídeo, e um terceiro elemento que chame a atenção, crie curiosidade ou interaja emocionalmente com o personagem/tema.\n"
+            "    *   **Estilo Visual:** Chamativo, cores vibrantes (ou paleta específica se relevante ao tema), boa iluminação no rosto.\n"
+            "    *   **Composição:** Foco no rosto, evitando texto overlay na imagem (o título do vídeo já cumpre essa função).\n"
+            "    *   **Objetivo:** Despertar curiosidade e impacto emocional.\n"
+            "    Forneça o prompt em Português e sua tradução para o Inglês.\n\n"
+        )),
+        ("Roteiro", "--- ROTEIRO DO VÍDEO PARA ANÁLISE ---\n" + script),
+    ]
+
+def generate_titles_and_description(client, model: str, script: str, variante: str = "original") -> str:
     """Gera títulos, descrição, hashtags, tags e prompt de thumbnail para o YouTube."""
-    prompt = (
-        "Com base no roteiro de vídeo fornecido:\n\n"
-        "1.  **Títulos (Ranking):** Crie 5 sugestões de título para vídeo de YouTube, cada um com no máximo 60 caracteres. Os títulos devem despertar curiosidade, prometer um benefício claro e/ou criar um senso de urgência. Eles devem seguir as melhores práticas para títulos chamativos e bem-sucedidos no YouTube, visando aumentar os cliques sem se afastar do conteúdo do vídeo. Apresente os títulos em um ranking, do melhor para o menos preferido, com uma breve justificativa para o título principal.\n\n"
-        "2.  **Descrição do Vídeo:** Elabore uma descrição otimizada para SEO com aproximadamente 1800 caracteres. A descrição deve:\n"
-        "    *   Começar com 1-2 frases que expandam o título e o gancho do vídeo, incluindo palavras-chave principais.\n"
-        "    *   Resumir os pontos chave e benefícios do vídeo.\n"
-        "    *   Incluir chamadas para ação (inscrever-se, assistir outros vídeos, links relevantes se houver).\n"
-        "    *   Conter um bloco de hashtags relevantes (ex: #fé #bíblia #mensagemdodia).\n\n"
-        "3.  **Tags:** Liste de 10 a 15 tags relevantes para o vídeo, separadas por vírgulas.\n\n"
-        "4.  **Prompt para Thumbnail (Português e Inglês):** Sugira um prompt detalhado para a criação da imagem da thumbnail usando IA (ex: Midjourney, DALL-E). O prompt deve considerar:\n"
-        "    *   **3 Elementos Visuais Principais:** Um rosto humano com expressão forte e visível (localizado preferencialmente à direita da imagem), uma cena de fundo ou elemento que remeta ao tema do vídeo, e um terceiro elemento que chame a atenção, crie curiosidade ou interaja emocionalmente com o personagem/tema.\n"
-        "    *   **Estilo Visual:** Chamativo, cores vibrantes (ou paleta específica se relevante ao tema), boa iluminação no rosto.\n"
-        "    *   **Composição:** Foco no rosto, evitando texto overlay na imagem (o título do vídeo já cumpre essa função).\n"
-        "    *   **Objetivo:** Despertar curiosidade e impacto emocional.\n"
-        "    Forneça o prompt em Português e sua tradução para o Inglês.\n\n"
-        "--- ROTEIRO DO VÍDEO PARA ANÁLISE ---\n"
-        + script
-    )
+    prompt = join_sections(PROMPT_VARIANTS["metadados"][variante](script))
     return call_genai(client, model, prompt)
 
 
+# Variantes de prompt por etapa. "original" reproduz exatamente os prompts acima;
+# "compacto" mantém as mesmas restrições sem repetições, emojis e tabelas de tempo.
+PROMPT_VARIANTS = {
+    "roteiro_inicial": {
+        "original": initial_script_sections,
+        "compacto": compact_initial_script_sections,
+    },
+    "revisao": {
+        "original": revise_script_sections,
+        "compacto": compact_revise_script_sections,
+    },
+    "metadados": {
+        "original": titles_and_description_sections,
+    },
+}
+
 def main():
     st.set_page_config(page_title="Roteiro YouTube AI", page_icon="📜", layout="wide")
     st.title("Gerador de Roteiro e Metadados para YouTube")
@@ -312,26 +462,44 @@ def main():
         st.error("Falha crítica: Cliente GenAI não foi inicializado.")
         st.stop()
 
+    show_singleflight_metrics()
+
+    show_search_panel(
+        {"roteiro_inicial": "roteiro_inicial", "roteiro_revisado": "roteiro_revisado", "metadados": "meta"},
+        {"tema": "tema", "objetivo": "objetivo", "num_palavras": "num_palavras", "variante": "variante_prompt"},
+    )
+
+    st.sidebar.header("Prompts")
+    variante_prompt = st.sidebar.selectbox(
+        "Variante de prompt (roteiro e revisão)", ["original", "compacto"],
+        help="A variante compacta mantém as mesmas regras com menos tokens de entrada.",
+        key="variante_prompt"
+    )
+
     st.header("1. Defina o Conteúdo do Roteiro")
-    tema = st.text_input("Tema Bíblico Específico:", placeholder="Ex: A história de Davi e Golias e suas lições de coragem")
+    # Valores iniciais via session_state, para que o arquivo de roteiros possa restaurá-los
+    if "objetivo" not in st.session_state:
+        st.session_state.objetivo = "Que podemos aprender com as lições dos outros ou Que Deus sempre perdoa e podemos recomeçar (relevante pois todos erram)"
+    if "num_palavras" not in st.session_state:
+        st.session_state.num_palavras = 1000
+    # Roteiros arquivados pelo RoteiroFluxo podem ter menos palavras que o mínimo deste app
+    if st.session_state.num_palavras < 200:
+        st.session_state.num_palavras = 200
+
+    tema = st.text_input("Tema Bíblico Específico:", placeholder="Ex: A história de Davi e Golias e suas lições de coragem", key="tema")
     objetivo = st.text_input(
         "Objetivo Principal/Mensagem Chave (O Quê e o Porquê):",
-        value="Que podemos aprender com as lições dos outros ou Que Deus sempre perdoa e podemos recomeçar (relevante pois todos erram)",
-        placeholder="Ex: Inspirar fé através da perseverança de Jó"
+        placeholder="Ex: Inspirar fé através da perseverança de Jó",
+        key="objetivo"
     )
     num_palavras = st.number_input(
         "Número aproximado de palavras para o roteiro:",
-        min_value=200, max_value=10000, value=1000, step=100,
-        help="Um roteiro de 1000 palavras tem aproximadamente 7-8 minutos de narração."
+        min_value=200, max_value=10000, step=100,
+        help="Um roteiro de 1000 palavras tem aproximadamente 7-8 minutos de narração.",
+        key="num_palavras"
     )
 
-    if "roteiro_inicial" not in st.session_state:
-        st.session_state.roteiro_inicial = ""
-    if "meta" not in st.session_state:
-        st.session_state.meta = ""
-    if "roteiro_revisado" not in st.session_state:
-        st.session_state.roteiro_revisado = ""
-
+    # Os textos ficam no histórico comprimido de artefatos; a sessão guarda apenas os handles
     col1, col2 = st.columns(2)
 
     with col1:
@@ -342,30 +510,38 @@ def main():
                 st.error("Por favor, preencha o objetivo principal.")
             else:
                 try:
+                    new_run()
                     with st.spinner("Gerando roteiro inicial... Por favor, aguarde."):
-                        st.session_state.roteiro_inicial = generate_initial_script(client, model_name, tema, objetivo, num_palavras)
+                        roteiro_inicial = generate_initial_script(client, model_name, tema, objetivo, num_palavras, variante_prompt)
+                        save_artifact("roteiro_inicial", roteiro_inicial)
+                        archive_artifact("roteiro_inicial", roteiro_inicial, tema, model_name, objetivo=objetivo, num_palavras=num_palavras, variante=variante_prompt)
                     st.success("Roteiro inicial gerado!")
 
                     with st.spinner("Gerando títulos, descrição e prompt de thumbnail..."):
-                        palavras_roteiro = st.session_state.roteiro_inicial.split()
+                        palavras_roteiro = roteiro_inicial.split()
                         roteiro_curto_para_meta = " ".join(palavras_roteiro[:1500])
-                        st.session_state.meta = generate_titles_and_description(client, model_name, roteiro_curto_para_meta)
+                        meta = generate_titles_and_description(client, model_name, roteiro_curto_para_meta)
+                        save_artifact("meta", meta)
+                        archive_artifact("metadados", meta, tema, model_name, objetivo=objetivo, num_palavras=num_palavras, variante=variante_prompt)
                     st.success("Metadados gerados!")
-                    st.session_state.roteiro_revisado = ""
+                    clear_artifact("roteiro_revisado")
 
                 except RuntimeError as e:
                     st.error(f"Ocorreu um erro: {e}")
                 except Exception as e:
                     st.error(f"Ocorreu um erro inesperado: {e}")
     with col2:
-        if st.session_state.roteiro_inicial:
+        roteiro_inicial = load_artifact("roteiro_inicial")
+        if roteiro_inicial:
             if st.button("🔄 Revisar Roteiro Inicial", use_container_width=True):
-                if not st.session_state.roteiro_inicial.strip():
+                if not roteiro_inicial.strip():
                     st.warning("Gere um roteiro inicial primeiro para poder revisá-lo.")
                 else:
                     try:
                         with st.spinner("Revisando roteiro... Por favor, aguarde."):
-                            st.session_state.roteiro_revisado = revise_script(client, model_name, st.session_state.roteiro_inicial, num_palavras)
+                            roteiro_revisado = revise_script(client, model_name, roteiro_inicial, num_palavras, variante_prompt)
+                            save_artifact("roteiro_revisado", roteiro_revisado)
+                            archive_artifact("roteiro_revisado", roteiro_revisado, tema, model_name, objetivo=objetivo, num_palavras=num_palavras, variante=variante_prompt)
                         st.success("Roteiro revisado com sucesso!")
                     except RuntimeError as e:
                         st.error(f"Ocorreu um erro durante a revisão: {e}")
@@ -378,12 +554,14 @@ def main():
     tab_inicial, tab_meta, tab_revisado = st.tabs(["📜 Roteiro Inicial", "📊 Metadados", "✍️ Roteiro Revisado"])
 
     with tab_inicial:
-        if st.session_state.roteiro_inicial:
+        show_history("roteiro_inicial", "Roteiro Inicial")
+        roteiro_inicial = load_artifact("roteiro_inicial")
+        if roteiro_inicial:
             st.subheader("Roteiro Inicial Gerado")
-            st.text_area("Roteiro Inicial:", st.session_state.roteiro_inicial, height=400, key="text_area_inicial")
+            st.text_area("Roteiro Inicial:", roteiro_inicial, height=400, key="text_area_inicial")
             st.download_button(
                 label="📥 Baixar Roteiro Inicial",
-                data=st.session_state.roteiro_inicial,
+                data=roteiro_inicial,
                 file_name=f"roteiro_inicial_{tema[:20].replace(' ','_') if tema else 'sem_tema'}.txt",
                 mime="text/plain"
             )
@@ -391,12 +569,14 @@ def main():
             st.info("Clique em 'Gerar Roteiro Inicial e Metadados' para começar.")
 
     with tab_meta:
-        if st.session_state.meta:
+        show_history("meta", "Metadados")
+        meta = load_artifact("meta")
+        if meta:
             st.subheader("Títulos, Descrição e Prompt de Thumbnail")
-            st.text_area("Metadados:", st.session_state.meta, height=400, key="text_area_meta")
+            st.text_area("Metadados:", meta, height=400, key="text_area_meta")
             st.download_button(
                 label="📥 Baixar Metadados",
-                data=st.session_state.meta,
+                data=meta,
                 file_name=f"metadados_{tema[:20].replace(' ','_') if tema else 'sem_tema'}.txt",
                 mime="text/plain"
             )
@@ -404,20 +584,45 @@ def main():
             st.info("Metadados serão gerados junto com o roteiro inicial.")
 
     with tab_revisado:
-        if st.session_state.roteiro_revisado:
+        show_history("roteiro_revisado", "Roteiro Revisado")
+        roteiro_revisado = load_artifact("roteiro_revisado")
+        if roteiro_revisado:
             st.subheader("Roteiro Revisado")
-            st.text_area("Roteiro Revisado:", st.session_state.roteiro_revisado, height=400, key="text_area_revisado")
+            st.text_area("Roteiro Revisado:", roteiro_revisado, height=400, key="text_area_revisado")
             st.download_button(
                 label="📥 Baixar Roteiro Revisado",
-                data=st.session_state.roteiro_revisado,
+                data=roteiro_revisado,
                 file_name=f"roteiro_revisado_{tema[:20].replace(' ','_') if tema else 'sem_tema'}.txt",
                 mime="text/plain"
             )
-        elif st.session_state.roteiro_inicial:
+        elif roteiro_inicial:
             st.info("Clique em 'Revisar Roteiro Inicial' se desejar uma versão aprimorada.")
         else:
             st.info("Gere um roteiro inicial primeiro. A opção de revisão aparecerá em seguida.")
 
+    st.markdown("---")
+    # Perfil de tokens por seção e A/B entre as variantes de prompt
+    if not tema.strip():
+        bloqueio = "Por favor, preencha o tema bíblico."
+    elif not objetivo.strip():
+        bloqueio = "Por favor, preencha o objetivo principal."
+    else:
+        bloqueio = None
+    etapas = {
+        "roteiro_inicial": {
+            "variantes": PROMPT_VARIANTS["roteiro_inicial"],
+            "args": (tema, objetivo, num_palavras),
+            "bloqueio": bloqueio,
+        },
+    }
+    if roteiro_inicial:
+        etapas["revisao"] = {"variantes": PROMPT_VARIANTS["revisao"], "args": (roteiro_inicial, num_palavras)}
+        etapas["metadados"] = {
+            "variantes": PROMPT_VARIANTS["metadados"],
+            "args": (" ".join(roteiro_inicial.split()[:1500]),),
+        }
+    show_prompt_lab(client, model_name, etapas, lambda prompt: call_genai(client, model_name, prompt, compartilhar=False), num_palavras)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,205 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+import uuid
+
+import streamlit as st
+
+from artefatos import clear_artifact, save_artifact
+
+# Arquivo local e pesquisável de tudo o que os apps geram (roteiros, análises, revisões, metadados, ganchos).
+# Usa SQLite com índice FTS5; o tokenizador unicode61 com remove_diacritics faz "salomao" achar "Salomão".
+
+# Marcadores do snippet que não aparecem em texto gerado; viram negrito só depois de escapar o markdown
+_INICIO_DESTAQUE = "\x02"
+_FIM_DESTAQUE = "\x03"
+
+TIPOS = {
+    "roteiro_inicial": "Roteiro Inicial",
+    "analise": "Análise",
+    "roteiro_revisado": "Roteiro Revisado",
+    "metadados": "Metadados",
+    "gancho": "Gancho",
+}
+
+
+class ScriptArchive:
+    """Guarda cada artefato gerado com tema, modelo e parâmetros, indexado para busca de texto completo."""
+
+    def __init__(self, caminho: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(caminho, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS artefatos (
+                    id INTEGER PRIMARY KEY,
+                    criado_em REAL NOT NULL,
+                    tipo TEXT NOT NULL,
+                    tema TEXT NOT NULL,
+                    modelo TEXT NOT NULL,
+                    parametros TEXT NOT NULL,
+                    texto TEXT NOT NULL,
+                    execucao TEXT NOT NULL DEFAULT ''
+                )
+                """
+            )
+            # Bancos criados antes do identificador de execução
+            colunas = [linha["name"] for linha in self._conn.execute("PRAGMA table_info(artefatos)")]
+            if "execucao" not in colunas:
+                self._conn.execute("ALTER TABLE artefatos ADD COLUMN execucao TEXT NOT NULL DEFAULT ''")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS artefatos_execucao ON artefatos (execucao)")
+            self._conn.execute(
+                """
+                CREATE VIRTUAL TABLE IF NOT EXISTS artefatos_fts USING fts5(
+                    tema, texto,
+                    content='artefatos', content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2'
+                )
+                """
+            )
+
+    def salvar(self, tipo: str, texto: str, tema: str, modelo: str, parametros: dict, execucao: str = "") -> int:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO artefatos (criado_em, tipo, tema, modelo, parametros, texto, execucao) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (time.time(), tipo, tema, modelo, json.dumps(parametros, ensure_ascii=False), texto, execucao),
+            )
+            self._conn.execute(
+                "INSERT INTO artefatos_fts (rowid, tema, texto) VALUES (?, ?, ?)",
+                (cursor.lastrowid, tema, texto),
+            )
+            return cursor.lastrowid
+
+    def buscar(self, consulta: str, limite: int = 20) -> list:
+        """Busca por todas as palavras da consulta (prefixo, sem acento), ordenando por relevância."""
+        termos = re.findall(r"\w+", consulta)
+        if not termos:
+            return []
+        expressao = " ".join(f'"{termo}"*' for termo in termos)
+        with self._lock:
+            linhas = self._conn.execute(
+                """
+                SELECT a.id, a.criado_em, a.tipo, a.tema, a.modelo, a.parametros,
+                       snippet(artefatos_fts, 1, char(2), char(3), '…', 12) AS trecho
+                FROM artefatos_fts
+                JOIN artefatos AS a ON a.id = artefatos_fts.rowid
+                WHERE artefatos_fts MATCH ?
+                ORDER BY bm25(artefatos_fts, 5.0, 1.0)
+                LIMIT ?
+                """,
+                (expressao, limite),
+            ).fetchall()
+        return [dict(linha) for linha in linhas]
+
+    def obter(self, artefato_id: int) -> dict:
+        with self._lock:
+            linha = self._conn.execute("SELECT * FROM artefatos WHERE id = ?", (artefato_id,)).fetchone()
+        if linha is None:
+            raise KeyError(f"Artefato {artefato_id} não encontrado no arquivo.")
+        return dict(linha)
+
+    def obter_execucao(self, execucao: str) -> list:
+        """Todos os artefatos de uma mesma execução (geração), na ordem em que foram criados."""
+        with self._lock:
+            linhas = self._conn.execute(
+                "SELECT * FROM artefatos WHERE execucao = ? ORDER BY id", (execucao,)
+            ).fetchall()
+        return [dict(linha) for linha in linhas]
+
+    def total(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM artefatos").fetchone()[0]
+
+
+@st.cache_resource
+def get_archive() -> ScriptArchive:
+    """Instância única por processo; o caminho do banco pode ser definido em `arquivo_path` nos secrets."""
+    return ScriptArchive(st.secrets.get("arquivo_path", "roteiros.sqlite3"))
+
+
+def _trecho_markdown(trecho: str) -> str:
+    """Escapa o markdown do texto arquivado e só então aplica o destaque dos termos encontrados."""
+    trecho = re.sub(r"([\\`*_{}\[\]()#+\-.!|>~<$])", r"\\\1", " ".join(trecho.split()))
+    return trecho.replace(_INICIO_DESTAQUE, "**").replace(_FIM_DESTAQUE, "**")
+
+
+def new_run() -> str:
+    """Inicia uma nova execução na sessão; os artefatos arquivados a seguir ficam agrupados nela."""
+    st.session_state.execucao = uuid.uuid4().hex
+    return st.session_state.execucao
+
+
+def archive_artifact(tipo: str, texto: str, tema: str, modelo: str, **parametros) -> None:
+    """Arquiva um artefato gerado na execução atual. Falhas no arquivo não interrompem o fluxo principal."""
+    execucao = st.session_state.get("execucao") or new_run()
+    try:
+        get_archive().salvar(tipo, texto, tema, modelo, parametros, execucao)
+    except sqlite3.Error as e:
+        st.warning(f"Não foi possível arquivar o {TIPOS.get(tipo, tipo).lower()}: {e}")
+
+
+def _load_run(resultado: dict, destinos: dict, entradas: dict) -> None:
+    """Carrega na sessão o artefato escolhido junto com os demais da mesma execução.
+
+    Artefatos do app sem correspondente na execução são limpos, para não misturar roteiros
+    diferentes; tema e parâmetros voltam para os campos indicados em `entradas`.
+    """
+    archive = get_archive()
+    escolhido = archive.obter(resultado["id"])
+    grupo = archive.obter_execucao(escolhido["execucao"]) if escolhido["execucao"] else [escolhido]
+    ultimos = {linha["tipo"]: linha for linha in grupo}
+    ultimos[escolhido["tipo"]] = escolhido
+    for tipo, nome in destinos.items():
+        if tipo in ultimos:
+            save_artifact(nome, ultimos[tipo]["texto"])
+        else:
+            clear_artifact(nome)
+
+    # Novas gerações a partir daqui (ex.: revisão) continuam na mesma execução
+    if escolhido["execucao"]:
+        st.session_state.execucao = escolhido["execucao"]
+    else:
+        new_run()
+    valores = {"tema": escolhido["tema"], **json.loads(escolhido["parametros"])}
+    for parametro, chave in entradas.items():
+        if parametro in valores:
+            st.session_state[chave] = valores[parametro]
+
+
+def show_search_panel(destinos: dict, entradas: dict = None) -> None:
+    """Painel de busca na sidebar.
+
+    `destinos` mapeia o tipo arquivado para o nome do artefato no app; `entradas` mapeia
+    o tema e os parâmetros arquivados para as chaves dos widgets de entrada. O resultado
+    escolhido volta para a sessão com toda a sua execução, sem chamar o modelo. Deve ser
+    chamado antes de criar os widgets de entrada.
+    """
+    st.sidebar.header("Arquivo de Roteiros")
+    try:
+        archive = get_archive()
+    except sqlite3.Error as e:
+        st.sidebar.warning(f"Arquivo indisponível: {e}")
+        return
+    consulta = st.sidebar.text_input("Buscar nos roteiros gerados:", placeholder="Ex: salomao sabedoria", key="busca_arquivo")
+    if not consulta.strip():
+        st.sidebar.caption(f"{archive.total()} artefatos arquivados.")
+        return
+
+    inicio = time.perf_counter()
+    resultados = archive.buscar(consulta)
+    st.sidebar.caption(f"{len(resultados)} resultado(s) em {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+    for resultado in resultados:
+        data = time.strftime("%d/%m/%Y %H:%M", time.localtime(resultado["criado_em"]))
+        st.sidebar.markdown(f"**{TIPOS.get(resultado['tipo'], resultado['tipo'])}** · {resultado['tema'] or 'sem tema'}")
+        st.sidebar.caption(f"{data} · {resultado['modelo']}")
+        st.sidebar.markdown(_trecho_markdown(resultado["trecho"]))
+        nome = destinos.get(resultado["tipo"])
+        if nome and st.sidebar.button("📂 Carregar", key=f"carregar_arquivo_{resultado['id']}"):
+            _load_run(resultado, destinos, entradas or {})
+            st.sidebar.success("Carregado na sessão.")
@@ -0,0 +1,233 @@
+import difflib
+import json
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+
+import streamlit as st
+
+# Histórico de versões comprimido para os textos gerados (roteiros, análises, metadados, ganchos).
+# O st.session_state guarda apenas handles (série + revisão); o texto fica comprimido aqui.
+
+
+def _encode_delta(base: str, texto: str) -> bytes:
+    """Codifica `texto` como delta por linhas em relação a `base`."""
+    linhas_base = base.splitlines(keepends=True)
+    linhas_novas = texto.splitlines(keepends=True)
+    matcher = difflib.SequenceMatcher(None, linhas_base, linhas_novas, autojunk=False)
+    operacoes = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            operacoes.append([i1, i2])
+        elif tag in ("replace", "insert"):
+            operacoes.append("".join(linhas_novas[j1:j2]))
+        # "delete": as linhas da base simplesmente não são copiadas
+    return zlib.compress(json.dumps(operacoes, ensure_ascii=False).encode("utf-8"), 9)
+
+
+def _apply_delta(base: str, blob: bytes) -> str:
+    linhas_base = base.splitlines(keepends=True)
+    partes = []
+    for op in json.loads(zlib.decompress(blob).decode("utf-8")):
+        if isinstance(op, str):
+            partes.append(op)
+        else:
+            partes.extend(linhas_base[op[0]:op[1]])
+    return "".join(partes)
+
+
+class ArtifactStore:
+    """Guarda revisões de textos comprimidas com zlib, em séries (uma por artefato de cada sessão).
+
+    A primeira revisão de uma série é guardada completa; as seguintes viram deltas em relação
+    à anterior, a menos que o texto completo comprimido seja menor. A cada `intervalo_completo`
+    revisões uma versão completa é forçada, limitando o custo de restaurar qualquer versão.
+
+    A memória é limitada em bytes (`max_bytes`): quando o limite é ultrapassado, sessões inteiras
+    são descartadas, da usada há mais tempo para a mais recente. Ler ou gravar qualquer série
+    conta como uso da sessão, e a sessão que está gravando nunca é descartada.
+    """
+
+    def __init__(self, max_revisoes: int = 20, max_bytes: int = 64 * 1024 * 1024, intervalo_completo: int = 5):
+        self._lock = threading.Lock()
+        self._sessoes = OrderedDict()
+        self._series = {}
+        self._bytes = 0
+        self.max_revisoes = max_revisoes
+        self.max_bytes = max_bytes
+        self.intervalo_completo = intervalo_completo
+
+    def nova_serie(self, sessao: str) -> str:
+        serie = uuid.uuid4().hex
+        with self._lock:
+            self._sessoes.setdefault(sessao, []).append(serie)
+            self._sessoes.move_to_end(sessao)
+            self._series[serie] = {"sessao": sessao, "primeira": 0, "revisoes": []}
+        return serie
+
+    def _dados(self, serie: str) -> dict:
+        """Dados da série, marcando sua sessão como usada agora."""
+        dados = self._series.get(serie)
+        if dados is None:
+            raise KeyError(f"Série de artefato desconhecida: {serie}")
+        self._sessoes.move_to_end(dados["sessao"])
+        return dados
+
+    def _liberar(self, sessao_atual: str) -> None:
+        while self._bytes > self.max_bytes:
+            sessao = next(iter(self._sessoes))
+            if sessao == sessao_atual:
+                break
+            for serie in self._sessoes.pop(sessao):
+                dados = self._series.pop(serie)
+                self._bytes -= sum(len(rev["blob"]) for rev in dados["revisoes"])
+
+    def _texto(self, revisoes: list, indice: int) -> str:
+        inicio = indice
+        while revisoes[inicio]["delta"]:
+            inicio -= 1
+        texto = zlib.decompress(revisoes[inicio]["blob"]).decode("utf-8")
+        for rev in revisoes[inicio + 1:indice + 1]:
+            texto = _apply_delta(texto, rev["blob"])
+        return texto
+
+    def adicionar(self, serie: str, texto: str) -> int:
+        """Adiciona uma nova revisão à série e devolve seu número."""
+        with self._lock:
+            dados = self._dados(serie)
+            revisoes = dados["revisoes"]
+
+            completo = zlib.compress(texto.encode("utf-8"), 9)
+            rev = {"blob": completo, "delta": False, "tamanho": len(texto), "criado_em": time.time()}
+            desde_completo = 0
+            for anterior in reversed(revisoes):
+                if not anterior["delta"]:
+                    break
+                desde_completo += 1
+            if revisoes and desde_completo + 1 < self.intervalo_completo:
+                delta = _encode_delta(self._texto(revisoes, len(revisoes) - 1), texto)
+                if len(delta) < len(completo):
+                    rev.update(blob=delta, delta=True)
+            revisoes.append(rev)
+            self._bytes += len(rev["blob"])
+
+            if len(revisoes) > self.max_revisoes:
+                # A nova revisão mais antiga precisa ser completa para continuar restaurável
+                if revisoes[1]["delta"]:
+                    texto_antigo = self._texto(revisoes, 1)
+                    self._bytes -= len(revisoes[1]["blob"])
+                    revisoes[1].update(blob=zlib.compress(texto_antigo.encode("utf-8"), 9), delta=False)
+                    self._bytes += len(revisoes[1]["blob"])
+                self._bytes -= len(revisoes.pop(0)["blob"])
+                dados["primeira"] += 1
+
+            self._liberar(dados["sessao"])
+            return dados["primeira"] + len(revisoes) - 1
+
+    def obter(self, serie: str, numero: int) -> str:
+        with self._lock:
+            dados = self._dados(serie)
+            indice = numero - dados["primeira"]
+            if not 0 <= indice < len(dados["revisoes"]):
+                raise KeyError(f"Revisão {numero} não está mais disponível.")
+            return self._texto(dados["revisoes"], indice)
+
+    def revisoes(self, serie: str) -> list:
+        with self._lock:
+            if serie not in self._series:
+                return []
+            dados = self._dados(serie)
+            return [
+                {
+                    "numero": dados["primeira"] + i,
+                    "criado_em": rev["criado_em"],
+                    "tamanho": rev["tamanho"],
+                    "armazenado": len(rev["blob"]),
+                    "delta": rev["delta"],
+                }
+                for i, rev in enumerate(dados["revisoes"])
+            ]
+
+    def tem_serie(self, serie: str) -> bool:
+        with self._lock:
+            return serie in self._series
+
+
+@st.cache_resource
+def get_artifact_store() -> ArtifactStore:
+    """Instância única por processo, compartilhada entre todas as sessões do Streamlit."""
+    return ArtifactStore()
+
+
+def _handles() -> dict:
+    if "artefatos" not in st.session_state:
+        st.session_state.artefatos = {}
+        st.session_state.artefatos_sessao = uuid.uuid4().hex
+    return st.session_state.artefatos
+
+
+def save_artifact(nome: str, texto: str) -> int:
+    """Salva uma nova versão do artefato `nome` e aponta a sessão para ela."""
+    store = get_artifact_store()
+    handle = _handles().get(nome)
+    if handle is None or not store.tem_serie(handle["serie"]):
+        handle = {"serie": store.nova_serie(st.session_state.artefatos_sessao), "rev": None}
+        _handles()[nome] = handle
+    handle["rev"] = store.adicionar(handle["serie"], texto)
+    return handle["rev"]
+
+
+def load_artifact(nome: str) -> str:
+    """Devolve o texto da versão atual do artefato `nome` ("" se não houver).
+
+    Se o histórico da sessão foi descartado por falta de memória, avisa o usuário e esquece o handle.
+    """
+    handle = _handles().get(nome)
+    if not handle or handle["rev"] is None:
+        return ""
+    try:
+        return get_artifact_store().obter(handle["serie"], handle["rev"])
+    except KeyError:
+        del _handles()[nome]
+        st.warning(
+            "O histórico deste texto foi descartado por falta de memória no servidor. "
+            "Busque-o no arquivo de roteiros ou gere-o novamente."
+        )
+        return ""
+
+
+def clear_artifact(nome: str) -> None:
+    """Deixa o artefato sem versão atual, mantendo o histórico."""
+    handle = _handles().get(nome)
+    if handle:
+        handle["rev"] = None
+
+
+def restore_artifact(nome: str, numero: int) -> None:
+    handle = _handles().get(nome)
+    if handle:
+        handle["rev"] = numero
+
+
+def show_history(nome: str, rotulo: str) -> None:
+    """Expander com as versões anteriores do artefato e opção de restaurar.
+
+    Deve ser chamado antes de exibir o artefato, para que a versão restaurada já apareça.
+    """
+    handle = _handles().get(nome)
+    if not handle:
+        return
+    revisoes = get_artifact_store().revisoes(handle["serie"])
+    if len(revisoes) < 2:
+        return
+    with st.expander(f"🕘 Histórico de versões — {rotulo}"):
+        opcoes = {
+            f"Versão {r['numero'] + 1} · {time.strftime('%H:%M:%S', time.localtime(r['criado_em']))} · "
+            f"{r['tamanho']} caracteres ({r['armazenado']} bytes{' delta' if r['delta'] else ''})": r["numero"]
+            for r in reversed(revisoes)
+        }
+        escolha = st.selectbox("Versão:", list(opcoes), key=f"historico_{nome}")
+        if st.button("↩️ Restaurar esta versão", key=f"restaurar_{nome}"):
+            restore_artifact(nome, opcoes[escolha])
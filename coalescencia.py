@@ -0,0 +1,104 @@
+import copy
+import hashlib
+import threading
+
+import streamlit as st
+
+# Coalescência de chamadas idênticas ao GenAI, compartilhada por todas as sessões do processo.
+
+
+class _Chamada:
+    """Uma chamada em andamento ao GenAI, compartilhada por todos que esperam o mesmo resultado."""
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado = None
+        self.erro = None
+
+
+class SingleFlight:
+    """Agrupa chamadas idênticas em andamento para que apenas uma vá até o GenAI.
+
+    Enquanto uma chamada com a mesma chave estiver em andamento, as demais sessões
+    esperam por ela e recebem o mesmo resultado (ou o mesmo erro).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._em_andamento = {}
+        self.metricas = {"chamadas": 0, "upstream": 0, "deduplicadas": 0}
+
+    def executar(self, chave, funcao):
+        with self._lock:
+            self.metricas["chamadas"] += 1
+            chamada = self._em_andamento.get(chave)
+            lider = chamada is None
+            if lider:
+                chamada = _Chamada()
+                self._em_andamento[chave] = chamada
+                self.metricas["upstream"] += 1
+            else:
+                self.metricas["deduplicadas"] += 1
+
+        if lider:
+            try:
+                chamada.resultado = funcao()
+            except Exception as e:
+                chamada.erro = e
+            except BaseException:
+                # Parada/rerun da sessão líder (ou interrupção do processo): só a líder
+                # recebe a exceção original; as demais recebem um erro neutro.
+                chamada.erro = RuntimeError("Chamada compartilhada interrompida.")
+                raise
+            finally:
+                with self._lock:
+                    del self._em_andamento[chave]
+                chamada.evento.set()
+            if chamada.erro is not None:
+                raise chamada.erro
+            return chamada.resultado
+
+        chamada.evento.wait()
+        if chamada.erro is not None:
+            # Cada sessão que esperava recebe sua própria cópia do erro, para que os
+            # tracebacks de threads diferentes não se misturem na mesma instância.
+            raise _copiar_erro(chamada.erro) from chamada.erro
+        return chamada.resultado
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self.metricas, em_andamento=len(self._em_andamento))
+
+
+def _copiar_erro(erro: Exception) -> Exception:
+    """Cópia do erro da chamada compartilhada (mesmo tipo e atributos), sem o traceback da líder."""
+    try:
+        return copy.copy(erro)
+    except Exception:
+        return RuntimeError(str(erro))
+
+
+@st.cache_resource
+def get_singleflight() -> SingleFlight:
+    """Instância única por processo, compartilhada entre todas as sessões do Streamlit."""
+    return SingleFlight()
+
+
+def _chave_requisicao(model: str, prompt: str, config=None) -> tuple:
+    """Chave de deduplicação: (modelo, hash do prompt, config)."""
+    return (model, hashlib.sha256(prompt.encode("utf-8")).hexdigest(), repr(config))
+
+
+def coalesce(model: str, prompt: str, config, funcao):
+    """Executa `funcao` uma única vez por (modelo, prompt, config) em andamento no processo."""
+    return get_singleflight().executar(_chave_requisicao(model, prompt, config), funcao)
+
+
+def show_singleflight_metrics() -> None:
+    """Métricas de deduplicação de chamadas idênticas entre sessões, na sidebar."""
+    metricas = get_singleflight().snapshot()
+    st.sidebar.header("Chamadas ao GenAI")
+    st.sidebar.caption(
+        f"Chamadas: {metricas['chamadas']} · Enviadas ao modelo: {metricas['upstream']} · "
+        f"Deduplicadas: {metricas['deduplicadas']} · Em andamento: {metricas['em_andamento']}"
+    )
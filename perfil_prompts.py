@@ -0,0 +1,129 @@
+import re
+import statistics
+import time
+
+import streamlit as st
+
+# Perfil de tamanho dos prompts por seção e benchmark A/B entre variantes de prompt.
+# As variantes são listas de seções (nome, texto), como as devolvidas por *_sections em RoteiroFluxoV2.py.
+
+
+def join_sections(secoes: list) -> str:
+    """Monta o prompt final a partir das seções (nome, texto)."""
+    return "".join(texto for _, texto in secoes)
+
+
+def estimate_tokens(texto: str) -> int:
+    """Estimativa local (~4 caracteres por token), usada quando a contagem pela API não está disponível."""
+    return max(1, round(len(texto) / 4)) if texto else 0
+
+
+def count_tokens(client, model: str, texto: str) -> tuple:
+    """Conta tokens pela API do GenAI; devolve (tokens, fonte)."""
+    try:
+        resposta = client.models.count_tokens(model=model, contents=texto)
+        return resposta.total_tokens, "API"
+    except Exception:
+        return estimate_tokens(texto), "estimativa"
+
+
+def profile_sections(client, model: str, secoes: list) -> list:
+    """Custo em caracteres e tokens de cada seção do prompt."""
+    linhas = []
+    for nome, texto in secoes:
+        tokens, fonte = count_tokens(client, model, texto)
+        linhas.append({"Seção": nome, "Caracteres": len(texto), "Tokens": tokens, "Fonte": fonte})
+    total = sum(linha["Tokens"] for linha in linhas) or 1
+    for linha in linhas:
+        linha["% do prompt"] = round(100 * linha["Tokens"] / total, 1)
+    return linhas
+
+
+def check_constraints(etapa: str, texto: str, num_palavras: int) -> dict:
+    """Checagens locais das regras do prompt sobre o texto gerado (nome da regra -> passou)."""
+    if etapa == "metadados":
+        return {"Resposta não vazia": bool(texto.strip())}
+    palavras = len(texto.split())
+    checagens = {
+        "Palavras ±15%": abs(palavras - num_palavras) <= 0.15 * num_palavras,
+        'Pausas com "..."': "..." in texto or "…" in texto,
+        "Sem marcações": not re.search(r"[\[\]]|^#|\*\*|SEÇÃO", texto, re.M),
+        "Sem gírias": "galera" not in texto.lower(),
+    }
+    if etapa == "revisao":
+        checagens["Sem marcações de tempo"] = not re.search(r"\b\d{1,2}:\d{2}\b|\bminuto \d+", texto, re.I)
+        checagens["8+ perguntas"] = texto.count("?") >= 8
+    return checagens
+
+
+def benchmark_variants(client, model: str, etapa: str, variantes: dict, gerar, num_palavras: int, repeticoes: int = 1) -> list:
+    """Roda cada variante `repeticoes` vezes, alternando a ordem, e mede latência, tokens de entrada e checagens.
+
+    `variantes` mapeia nome -> seções; `gerar(prompt)` faz a chamada ao modelo.
+    """
+    rodadas = []
+    nomes = list(variantes)
+    prompts = {nome: join_sections(secoes) for nome, secoes in variantes.items()}
+    tokens = {nome: count_tokens(client, model, prompt)[0] for nome, prompt in prompts.items()}
+    for rodada in range(repeticoes):
+        for nome in nomes if rodada % 2 == 0 else reversed(nomes):
+            prompt = prompts[nome]
+            inicio = time.perf_counter()
+            texto = gerar(prompt)
+            latencia = time.perf_counter() - inicio
+            checagens = check_constraints(etapa, texto, num_palavras)
+            rodadas.append({
+                "variante": nome,
+                "latencia": latencia,
+                "aprovadas": sum(checagens.values()),
+                "total": len(checagens),
+            })
+
+    resumo = []
+    for nome in nomes:
+        das_variante = [r for r in rodadas if r["variante"] == nome]
+        resumo.append({
+            "Variante": nome,
+            "Rodadas": len(das_variante),
+            "Latência média (s)": round(statistics.mean(r["latencia"] for r in das_variante), 2),
+            "Tokens de entrada": tokens[nome],
+            "Checagens aprovadas (%)": round(
+                100 * sum(r["aprovadas"] for r in das_variante) / sum(r["total"] for r in das_variante), 1
+            ),
+        })
+    return resumo
+
+
+def show_prompt_lab(client, model: str, etapas: dict, gerar, num_palavras: int) -> None:
+    """Expander com o perfil de tokens por seção e o A/B entre variantes.
+
+    `etapas` mapeia o nome da etapa para {"variantes": {nome: função de seções}, "args": argumentos}
+    e, opcionalmente, "bloqueio": mensagem que impede o A/B (ex.: entradas obrigatórias vazias).
+    """
+    with st.expander("🔬 Laboratório de prompts (perfil de tokens e A/B)"):
+        etapa = st.selectbox("Etapa:", list(etapas), key="lab_etapa")
+        variantes = {
+            nome: secoes(*etapas[etapa]["args"]) for nome, secoes in etapas[etapa]["variantes"].items()
+        }
+
+        if st.button("📏 Perfilar prompt", key="lab_perfil"):
+            for nome, secoes in variantes.items():
+                linhas = profile_sections(client, model, secoes)
+                st.markdown(f"**{nome}** — {sum(linha['Tokens'] for linha in linhas)} tokens")
+                st.table(linhas)
+
+        if len(variantes) < 2:
+            st.info("Esta etapa tem apenas a variante original; o A/B não se aplica.")
+            return
+        repeticoes = st.number_input("Rodadas por variante:", min_value=1, max_value=5, value=1, key="lab_repeticoes")
+        st.caption("O A/B chama o modelo de verdade para cada variante e rodada.")
+        if st.button("⚖️ Rodar A/B", key="lab_ab"):
+            if etapas[etapa].get("bloqueio"):
+                st.error(etapas[etapa]["bloqueio"])
+                return
+            try:
+                with st.spinner("Rodando variantes..."):
+                    resumo = benchmark_variants(client, model, etapa, variantes, gerar, num_palavras, repeticoes)
+                st.table(resumo)
+            except RuntimeError as e:
+                st.error(f"Ocorreu um erro durante o A/B: {e}")
@@ -1,6 +1,9 @@
 import streamlit as st
 from google import genai
 
+from arquivo import archive_artifact, new_run, show_search_panel
+from artefatos import load_artifact, save_artifact, show_history
+
 # App Streamlit para gerar roteiros de vídeos no YouTube usando Google Gemini
 
 def main():
@@ -20,6 +23,9 @@ def main():
         value=default_model
     )
 
+    # Busca no arquivo de roteiros já gerados
+    show_search_panel({"analise": "analysis", "roteiro_revisado": "new_script", "metadados": "titles_desc"})
+
     # Caixa de texto para roteiro original
     original = st.text_area(
         "Cole aqui seu roteiro original:",
@@ -32,66 +38,79 @@ def main():
         if not original.strip():
             st.error("Por favor, cole o roteiro original antes de analisar.")
         else:
+            new_run()
             with st.spinner("Analisando roteiro..."):
-                st.session_state.analysis = analyze_script(client, model_name, original)
+                analysis = analyze_script(client, model_name, original)
+                save_artifact("analysis", analysis)
+                archive_artifact("analise", analysis, "", model_name)
 
     # Exibir Análise se existir
-    if st.session_state.get("analysis"):
+    show_history("analysis", "Análise")
+    analysis = load_artifact("analysis")
+    if analysis:
         st.text_area(
             "Análise de gancho, retenção, engajamento e storytelling:",
-            st.session_state.analysis,
+            analysis,
             height=300,
             key="analysis_box",
             disabled=False
         )
 
     # Gerar Novo Roteiro
-    if st.session_state.get("analysis") and st.button("Gerar novo roteiro", key="btn_generate_script"):
+    if analysis and st.button("Gerar novo roteiro", key="btn_generate_script"):
         with st.spinner("Gerando novo roteiro..."):
-            st.session_state.new_script = generate_script(
+            new_script = generate_script(
                 client,
                 model_name,
                 original,
-                st.session_state.analysis
+                analysis
             )
+            save_artifact("new_script", new_script)
+            archive_artifact("roteiro_revisado", new_script, "", model_name)
 
     # Exibir Novo Roteiro se existir
-    if st.session_state.get("new_script"):
+    show_history("new_script", "Roteiro Reescrito")
+    new_script = load_artifact("new_script")
+    if new_script:
         st.text_area(
             "Roteiro reescrito (aprox. 25 min):",
-            st.session_state.new_script,
+            new_script,
             height=400,
             key="script_box",
             disabled=False
         )
         st.download_button(
             label="Baixar roteiro (.txt)",
-            data=st.session_state.new_script,
+            data=new_script,
             file_name="roteiro_reescrito.txt",
             mime="text/plain"
         )
 
     # Gerar Títulos e Descrição
-    if st.session_state.get("new_script") and st.button("Gerar títulos e descrição", key="btn_titles"):
+    if new_script and st.button("Gerar títulos e descrição", key="btn_titles"):
         with st.spinner("Gerando títulos e descrição..."):
-            st.session_state.titles_desc = generate_titles_and_description(
+            titles_desc = generate_titles_and_description(
                 client,
                 model_name,
-                st.session_state.new_script
+                new_script
             )
+            save_artifact("titles_desc", titles_desc)
+            archive_artifact("metadados", titles_desc, "", model_name)
 
     # Exibir Títulos e Descrição se existir
-    if st.session_state.get("titles_desc"):
+    show_history("titles_desc", "Títulos e Descrição")
+    titles_desc = load_artifact("titles_desc")
+    if titles_desc:
         st.text_area(
             "Sugestões de títulos e descrição de vídeo:",
-            st.session_state.titles_desc,
+            titles_desc,
             height=300,
             key="titles_box",
             disabled=False
         )
         st.download_button(
             label="Baixar títulos e descrição (.txt)",
-            data=st.session_state.titles_desc,
+            data=titles_desc,
             file_name="titulos_descricao.txt",
             mime="text/plain"
         )